@@ -2,6 +2,7 @@ use std::collections::HashMap;
 
 use crate::linear_algebra::Vector3D;
 use kdtree::{distance::squared_euclidean, KdTree};
+use rayon::prelude::*;
 
 #[derive(Debug)]
 struct BrepElement {
@@ -112,6 +113,7 @@ fn extent(points: &[Vector3D]) -> f64 {
 /// # Error
 /// Since this is an iterative algortihm, the maximum number of iterations is bound to 100.
 /// Gives back an ´Err´ in case that the maximum number of iterations is reached and no solution was found.
+/// Degenerate elements are passed with a zero normal and give back an ´Err´ without iterating.
 ///
 /// # Acknowledgements
 /// The shrinking ball algorithm was originally introduced by [^ma12]
@@ -123,6 +125,12 @@ pub fn shrink_ball(
     tree: &TreeManager3D,
     r_guess: Option<f64>,
 ) -> Result<(f64, f64, f64, Option<Vector3D>), String> {
+    if normal.length() == 0.0 {
+        return Err(format!(
+            "Element is degenerate. Skipping point:  {:?}",
+            base
+        ));
+    }
     let normal_unit = *normal * (1.0 / normal.length());
     let mut radius = r_guess.unwrap_or(2.0 * tree.extent);
     let mut distance = radius;
@@ -164,20 +172,27 @@ pub fn shrink_ball(
 
 impl TreeManager3D {
     pub fn eval_radii(&self) -> (Vec<f64>, Vec<f64>, Vec<f64>) {
+        // Every element is evaluated independently against the shared tree, so the work is spread over all cores.
+        let results: Vec<(&usize, (f64, f64, f64, Option<Vector3D>))> = self
+            .index
+            .par_iter()
+            .map(|(index, element)| {
+                match shrink_ball(&element.point, &element.normal, self, None) {
+                    Err(msg) => {
+                        println!("{}", msg);
+                        (index, (-1.0, -1.0, -90.0, None))
+                    }
+                    Ok(results) => (index, results),
+                }
+            })
+            .collect();
+
         let mut radii: Vec<(&usize, f64)> = vec![];
         let mut distances = vec![];
         let mut angles = vec![];
         let mut centers = String::new();
 
-        for (index, element) in &self.index {
-            let (radius, distance, angle, center) =
-                match shrink_ball(&element.point, &element.normal, self, None) {
-                    Err(msg) => {
-                        println!("{}", msg);
-                        (-1.0, -1.0, -90.0, None)
-                    }
-                    Ok(results) => results,
-                };
+        for (index, (radius, distance, angle, center)) in results {
             radii.push((index, radius));
             distances.push((index, distance));
             angles.push((index, angle));
@@ -35,6 +35,9 @@ for feature in config["features"]:
     if not (style is None or style in style_list):
         raise ConfigError("Did not find style " + str(style))
     
+# Elements with an area below this fraction of the largest element area are treated as degenerate
+DEGENERATE_AREA_RATIO = 1e-8
+
 ANALYSIS_DATATYPES = ["radii.inner", "radii.outer", "gradients.inner", "gradients.outer", "distances.inner", "distances.outer", "angles.inner", "angles.outer"]
 
 def __style_from_config__(style_key: str) -> dict[str, Any]:
@@ -80,31 +83,32 @@ def evaluateSpheres(input: str, output:str, triangulationSizing=0.0) -> None:
     """
     nc, inz, centers, normals, elementTags = getTriangulation(input, triangulationSizing)
 
-    r_inner, d_inner, alpha_inner = rust_methods.get_sphere_radii(centers, -normals, elementTags.tolist()) # type: ignore
+    indices = elementTags.tolist()
+    r_inner, d_inner, alpha_inner = rust_methods.get_sphere_radii(centers, -normals, indices) # type: ignore
     r_inner = np.array(r_inner)
     d_inner = np.array(d_inner)
     alpha_inner = np.array(alpha_inner)
 
-    r_outer, d_outer, alpha_outer = rust_methods.get_sphere_radii(centers, normals, elementTags.tolist()) # type: ignore
+    r_outer, d_outer, alpha_outer = rust_methods.get_sphere_radii(centers, normals, indices) # type: ignore
     r_outer = np.array(r_outer)
     d_outer = np.array(d_outer)
     alpha_outer = np.array(alpha_outer)
 
-    gradient = np.zeros_like(r_inner)
-    for i in range(gradient.shape[0]):
-        neighbours = (np.isin(inz, inz[i]).sum(axis=1) == 2).nonzero()[0]
-        neighbours = neighbours[r_inner[neighbours] != -1]  # neglect invalid radii
-        neighbours = neighbours[r_inner[neighbours] != np.Inf]  # neglect infinte radii
-        gradient[i] = np.linalg.norm(
-            (r_inner[i] - r_inner[neighbours]) / np.linalg.norm(centers[i] - centers[neighbours], axis=1))
-    
+    tris, neighbours = __triangle_neighbours__(inz)
+    valid = (r_inner[neighbours] != -1) * (r_inner[neighbours] != np.Inf)  # neglect invalid and infinite radii
+    tris = tris[valid]
+    neighbours = neighbours[valid]
+    slopes = (r_inner[tris] - r_inner[neighbours]) / np.linalg.norm(centers[tris] - centers[neighbours], axis=1)
+    gradient = np.sqrt(np.bincount(tris, weights=slopes**2, minlength=r_inner.shape[0]))
+
     #todo: Skalierung des Gradienten aufheben, sodass Heuvers-Zahlen verwendet werden können
 
     grad_inner_scaled = gradient - gradient.min()
 
-    btm_95_percent = (grad_inner_scaled < grad_inner_scaled.max() * 0.95)
-    grad_inner_scaled[grad_inner_scaled >= grad_inner_scaled.max() * 0.95] = grad_inner_scaled[btm_95_percent.nonzero()[0][grad_inner_scaled[btm_95_percent].argmax()]]
-    grad_inner_scaled = grad_inner_scaled / grad_inner_scaled.max()
+    # Clamp values above 95 % of the maximum to the largest value below it
+    cap = grad_inner_scaled[grad_inner_scaled < grad_inner_scaled.max() * 0.95].max()
+    np.minimum(grad_inner_scaled, cap, out=grad_inner_scaled)
+    grad_inner_scaled /= cap
 
     results = {
                "radii" : {"inner" : r_inner, "outer" : r_outer},
@@ -113,7 +117,7 @@ def evaluateSpheres(input: str, output:str, triangulationSizing=0.0) -> None:
                "angles" : {"inner" : alpha_inner, "outer" : alpha_outer}
                }
     
-    plot_in_gmsh(elementTags.tolist(), results)
+    plot_in_gmsh(elementTags, results)
 
     # Save data
     if not os.path.exists(os.path.dirname(output)):
@@ -131,10 +135,10 @@ def plot_in_gmsh(elements, results):
     Results are added as groups to gmsh as provided in subdicts
 
     Args:
-        elements (list): gmsh elements on which results shall be applied
+        elements (array_like): gmsh elements on which results shall be applied
         results (dict[str, dict[str, array]]): Hierarchial presentation of results
     """
-    elements = np.array(elements)
+    elements = np.asarray(elements)
     for feature in config["features"].values():
         group, name = __parse_name__(feature["name"])
         data_key = __parse_datatype__((feature["data"]))
@@ -148,7 +152,7 @@ def plot_in_gmsh(elements, results):
             print("Info\t: View " + feature['name'] + " was added")
             filter = __get_filter_as_configured__(results, feature)
             try:
-                view = __add_as_view_to_gmsh__(elements[filter].tolist(), data[filter].tolist(), name, group)
+                view = __add_as_view_to_gmsh__(elements[filter], data[filter], name, group)
     
                 style = __style_from_config__(feature["style"]) if "style" in feature else {}
                 max = feature["max"] if "max" in feature else np.max(data[filter])
@@ -221,36 +225,60 @@ def __MshFromGmsh__():
     Returns:
         tuple: nodeCoordinates(np.ndarray), elementNodeTags(np.ndarray), ?(np.ndarray)
     """
-    nodeCoords = np.array([], dtype=float)
     gmsh.model.mesh.renumber_nodes()
-    for i in range(0, 3):
-        rnodeCoords = gmsh.model.mesh.getNodes(i)[1]
-        nodeCoords = np.append(nodeCoords, rnodeCoords)
-    nc = nodeCoords.reshape(-1, 3)
+    nodeCoords = [gmsh.model.mesh.getNodes(i)[1] for i in range(0, 3)]
+    nc = np.concatenate(nodeCoords).reshape(-1, 3)
     _, elemTags, elemNodeTags = gmsh.model.mesh.getElements(2)
     elemTags = elemTags[0].astype(int)  # type: ignore
     inz = elemNodeTags[0].astype(int).reshape(  # type: ignore
         elemTags.shape[0], -1) - 1
 
-    C = np.mean(nc[inz], axis=1)
+    triCoords = nc[inz]
+    C = np.einsum("ijk->ik", triCoords) * (1.0 / 3.0)
     faceIDs = np.zeros(inz.shape[0], dtype=int)
-    for entity in gmsh.model.getEntities(2):
-        ID = entity[1]
-        elemTagsOnFace = gmsh.model.mesh.getElements(2, ID)[1][0]
-        for tag in elemTagsOnFace:
-            faceIDs[elemTags == tag] = ID
-
-    N = np.cross(nc[inz[:, 1]] - nc[inz[:, 0]], nc[inz[:, 2]] - nc[inz[:, 0]])
-    for i in range(inz.shape[0]):
-        para = gmsh.model.getParametrization(2, faceIDs[i], C[i])
-        N[i] = gmsh.model.getNormal(faceIDs[i], para)
-        N[i] = N[i] / np.linalg.norm(N[i])
+    IDs = [entity[1] for entity in gmsh.model.getEntities(2)]
+    elemTagsOnFaces = [gmsh.model.mesh.getElements(2, ID)[1][0] for ID in IDs]
+    order = np.argsort(elemTags)
+    pos = np.searchsorted(elemTags[order], np.concatenate(elemTagsOnFaces))
+    faceIDs[order[pos]] = np.repeat(IDs, [tags.shape[0] for tags in elemTagsOnFaces])
+
+    N = np.cross(triCoords[:, 1] - triCoords[:, 0], triCoords[:, 2] - triCoords[:, 0])
+    area = 0.5 * np.linalg.norm(N, axis=1, keepdims=True)
+    # Degenerate elements get a zero normal, which marks them as invalid for the radii evaluation
+    degenerate = area[:, 0] < DEGENERATE_AREA_RATIO * area.max()
+    N[degenerate] = 0.0
+    N[~degenerate] /= 2.0 * area[~degenerate]
+    # Triangles of one face are oriented consistently, so the orientation of the face's largest triangle is checked against gmsh
+    for ID in np.unique(faceIDs):
+        onFace = (faceIDs == ID).nonzero()[0]
+        ref = onFace[area[onFace, 0].argmax()]
+        para = gmsh.model.getParametrization(2, ID, C[ref])
+        if np.dot(N[ref], gmsh.model.getNormal(ID, para)) < 0:
+            N[onFace] *= -1
 
     return nc, inz, C, N, elemTags
 
+def __triangle_neighbours__(inz: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Find all pairs of triangles sharing an edge
+
+    Edges are hashed by packing their sorted node indices into a single integer. Sorting the hashes groups
+    identical edges, so that the owners of adjacent equal hashes are neighbours (assumes a manifold mesh).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: triangle indices and indices of their neighbours, each pair is contained in both directions
+    """
+    edges = np.sort(inz[:, [[0, 1], [0, 2], [1, 2]]], axis=2).reshape(-1, 2).astype(np.uint64)
+    keys = (edges[:, 0] << np.uint64(32)) | edges[:, 1]
+    order = np.argsort(keys, kind="stable")
+    shared = (keys[order[1:]] == keys[order[:-1]]).nonzero()[0]
+    tris = order[shared] // 3
+    neighbours = order[shared + 1] // 3
+    return np.concatenate((tris, neighbours)), np.concatenate((neighbours, tris))
+
 
-def __add_as_view_to_gmsh__(tags, data: list, view_name, group=None) -> int:
+def __add_as_view_to_gmsh__(tags, data: np.ndarray, view_name, group=None) -> int:
     """Add provided `data` as a view for `tags` to gmsh with `view_name` in optional `group`
+    Arrays are handed to gmsh as they are, since its API converts numpy arrays without building python lists
     
     Returns:
         int: view_tag